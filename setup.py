@@ -16,7 +16,15 @@ setup(
     packages=find_packages(
         include=["stormcatchments", "stormcatchments.*"], exclude=["tests"]
     ),
-    install_requires=["geopandas", "networkx", "pysheds", "rtree"],
+    install_requires=[
+        "geopandas",
+        "networkx",
+        "pyproj",
+        "pysheds",
+        "rasterio",
+        "rtree",
+        "shapely>=2.0",
+    ],
     extras_require={
         "basemap": "contextily",
         "dev": ["black", "pytest"],
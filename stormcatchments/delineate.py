@@ -1,9 +1,15 @@
-from copy import deepcopy
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+from typing import Optional
 
 import geopandas as gpd
 import numpy as np
+import pyproj
 import pysheds
-from shapely.geometry import Polygon
+from pysheds.grid import Grid
+from pysheds.sview import Raster
+import rasterio.features
+import shapely
 
 from stormcatchments.network import Network
 
@@ -15,6 +21,7 @@ def get_catchment(
     acc: "pysheds.sview.Raster",
     grid_epsg: int,
     acc_thresh: int = 1000,
+    acc_mask: Optional["pysheds.sview.Raster"] = None,
 ) -> gpd.GeoDataFrame:
     """
     Delineate catchment using pysheds
@@ -39,32 +46,122 @@ def get_catchment(
     acc_thresh : int (default 1000)
       The minimum accumulation threshold used during pour point snapping
 
+    acc_mask : pysheds.sview.Raster | None (default None)
+      Precomputed boolean raster of acc > acc_thresh used for pour point snapping,
+      computed from acc when None
+
     Returns
     -------
     catchment : gpd.GeoDataFrame
       A GeoDataFrame containing the newly delineated catchment polygon
     """
-    # create a deepcopy of the grid to not manipulate original grid
-    grid = deepcopy(grid)
-    x, y = pour_pt
-    x_snap, y_snap = grid.snap_to_mask(acc > acc_thresh, (x, y))
-    catch = grid.catchment(x=x_snap, y=y_snap, fdir=fdir)
-    grid.clip_to(catch)
-    catch_view = grid.view(catch, dtype=np.uint8)
-    catch_vec = grid.polygonize(catch_view)
-
-    catch_polys = []
-    for shape, _ in catch_vec:
-        assert shape["type"] == "Polygon"
-        all_poly_coords = shape["coordinates"]
-        for poly_coords in all_poly_coords:
-            catch_polys.append(Polygon(poly_coords))
+    if acc_mask is None:
+        acc_mask = acc > acc_thresh
 
+    catch_polys = _get_catchment_polys(pour_pt, grid, fdir, acc_mask)
     return gpd.GeoDataFrame(
         {"geometry": gpd.GeoSeries(catch_polys).set_crs(epsg=grid_epsg)}
     )
 
 
+def _get_catchment_polys(
+    pour_pt: tuple,
+    grid: "pysheds.sgrid.sGrid",
+    fdir: "pysheds.sview.Raster",
+    acc_mask: "pysheds.sview.Raster",
+) -> np.ndarray:
+    """
+    Delineate catchment using pysheds, returning the bare polygons of each ring of
+    the catchment raster, see get_catchment
+    """
+    # clip_to only swaps out the grid's viewfinder, so restore it afterwards
+    saved_viewfinder = grid.viewfinder
+    try:
+        x, y = pour_pt
+        x_snap, y_snap = grid.snap_to_mask(acc_mask, (x, y))
+        catch = grid.catchment(x=x_snap, y=y_snap, fdir=fdir)
+        grid.clip_to(catch)
+        catch_view = np.asarray(grid.view(catch, dtype=np.uint8))
+        catch_affine = grid.affine
+    finally:
+        grid.viewfinder = saved_viewfinder
+
+    catch_vec = rasterio.features.shapes(
+        catch_view, mask=catch_view > 0, transform=catch_affine
+    )
+
+    rings = []
+    for shape, _ in catch_vec:
+        rings.extend(shape["coordinates"])
+
+    ring_coords = np.concatenate([np.asarray(ring, dtype=np.float64) for ring in rings])
+    ring_indices = np.repeat(np.arange(len(rings)), [len(ring) for ring in rings])
+    catch_polys = shapely.polygons(
+        shapely.linearrings(ring_coords, indices=ring_indices)
+    )
+
+    return catch_polys
+
+
+def _cached_acc_mask(
+    acc_masks: dict, acc: "pysheds.sview.Raster", acc_thresh: int
+) -> "pysheds.sview.Raster":
+    """
+    Get the boolean raster of acc > acc_thresh from acc_masks, computing it when
+    missing. Only the mask for the most recently used threshold is kept, as each is
+    DEM-sized
+    """
+    if acc_thresh not in acc_masks:
+        acc_masks.clear()
+        acc_masks[acc_thresh] = acc > acc_thresh
+    return acc_masks[acc_thresh]
+
+
+# pysheds data for the current worker process, set by _init_worker
+_worker_data = {}
+
+
+def _raster_parts(raster: "pysheds.sview.Raster") -> tuple:
+    """
+    Split a pysheds Raster into picklable parts, Raster objects lose their viewfinder
+    when pickled directly
+    """
+    return np.asarray(raster), raster.viewfinder, raster.metadata
+
+
+def _init_worker(
+    grid_viewfinder: "pysheds.sview.ViewFinder",
+    fdir_parts: tuple,
+    acc_parts: tuple,
+) -> None:
+    """
+    Rebuild the grid and rasters once per worker process for parallel delineation
+    """
+    fdir_data, fdir_viewfinder, fdir_metadata = fdir_parts
+    acc_data, acc_viewfinder, acc_metadata = acc_parts
+    _worker_data["grid"] = Grid(viewfinder=grid_viewfinder)
+    _worker_data["fdir"] = Raster(
+        fdir_data, viewfinder=fdir_viewfinder, metadata=fdir_metadata
+    )
+    _worker_data["acc"] = Raster(
+        acc_data, viewfinder=acc_viewfinder, metadata=acc_metadata
+    )
+    _worker_data["acc_masks"] = {}
+
+
+def _get_catchment_worker(pour_pt: tuple, acc_thresh: int = 1000) -> "shapely.Geometry":
+    """
+    Delineate a catchment geometry within a worker process initialized by _init_worker
+    """
+    acc_mask = _cached_acc_mask(
+        _worker_data["acc_masks"], _worker_data["acc"], acc_thresh
+    )
+    catch_polys = _get_catchment_polys(
+        pour_pt, _worker_data["grid"], _worker_data["fdir"], acc_mask
+    )
+    return shapely.union_all(catch_polys)
+
+
 class Delineate:
     def __init__(
         self,
@@ -73,6 +170,7 @@ class Delineate:
         fdir: "pysheds.sview.Raster",
         acc: "pysheds.sview.Raster",
         grid_epsg: int,
+        n_jobs: Optional[int] = 1,
     ):
         """
         network : stormcatchments.network.Network
@@ -90,6 +188,14 @@ class Delineate:
 
         grid_epsg : int
           EPSG code for the CRS of the DEM
+
+        n_jobs : int | None (default 1)
+          Number of processes used to delineate catchments for multiple infrastructure
+          points at once, set to None to use all available CPUs. Worker processes are
+          started with the "spawn" method, so scripts using n_jobs != 1 must guard
+          their entry point with if __name__ == "__main__":. Each worker also imports
+          pysheds and compiles its numba functions on first use, so for a small
+          number of points the serial default can be faster
         """
 
         if not network.directions_resolved:
@@ -99,10 +205,60 @@ class Delineate:
             )
 
         self.net = network
+        # Rebuild the points' spatial index if it has been invalidated
+        self.net.pts.sindex
         self.grid = grid
         self.fdir = fdir
         self.acc = acc
         self.grid_epsg = grid_epsg
+        # Reuse the Network's CRS object when they match
+        self.crs = pyproj.CRS.from_epsg(grid_epsg)
+        if self.crs == network.crs:
+            self.crs = network.crs
+        self.n_jobs = n_jobs
+        # Worker pool, kept for a get_stormcatchment call or a with block
+        self._executor = None
+
+    def __enter__(self) -> "Delineate":
+        """
+        Keep a single worker pool running for every stormcatchment delineated within
+        the with block, when n_jobs != 1
+        """
+        if self.n_jobs != 1 and self._executor is None:
+            self._executor = self._start_executor()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        if self._executor is not None:
+            self._executor.shutdown()
+            self._executor = None
+
+    @property
+    def acc(self) -> "pysheds.sview.Raster":
+        return self._acc
+
+    @acc.setter
+    def acc(self, acc: "pysheds.sview.Raster") -> None:
+        self._acc = acc
+        # Snapping masks are derived from acc, so drop any cached ones
+        self._acc_masks = {}
+
+    def _get_acc_mask(self, acc_thresh: int) -> "pysheds.sview.Raster":
+        """
+        Get the boolean raster of acc > acc_thresh used for pour point snapping. Only
+        the mask for the most recently used threshold is kept, as each is DEM-sized
+
+        Parameters
+        ----------
+        acc_thresh : int
+          The minimum accumulation threshold used during pour point snapping
+
+        Returns
+        -------
+        acc_mask : pysheds.sview.Raster
+          Boolean raster of cells with an accumulation above acc_thresh
+        """
+        return _cached_acc_mask(self._acc_masks, self.acc, acc_thresh)
 
     def get_catchment(self, pour_pt: tuple, acc_thresh: int = 1000) -> gpd.GeoDataFrame:
         """
@@ -128,7 +284,62 @@ class Delineate:
             self.acc,
             self.grid_epsg,
             acc_thresh=acc_thresh,
+            acc_mask=self._get_acc_mask(acc_thresh),
+        )
+
+    def _to_frame(self, geom: "shapely.Geometry") -> gpd.GeoDataFrame:
+        """
+        Wrap a catchment geometry in a single row GeoDataFrame in the CRS of the grid
+        """
+        return gpd.GeoDataFrame(geometry=[geom], crs=self.crs)
+
+    def _start_executor(self) -> ProcessPoolExecutor:
+        """
+        Start a pool of worker processes which each hold their own copy of the grid,
+        flow direction and flow accumulation data
+
+        Returns
+        -------
+        executor : ProcessPoolExecutor
+          Pool of initialized worker processes
+        """
+        # Use spawned processes, forking after pysheds/numba have been loaded can
+        # deadlock the interpreter at exit
+        return ProcessPoolExecutor(
+            max_workers=self.n_jobs,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(
+                self.grid.viewfinder,
+                _raster_parts(self.fdir),
+                _raster_parts(self.acc),
+            ),
+        )
+
+    def _get_catchment_geom(
+        self, pour_pt: tuple, acc_thresh: int = 1000
+    ) -> "shapely.Geometry":
+        """
+        Delineate catchment using pysheds, returning the union of its polygons as a
+        single shapely geometry rather than a GeoDataFrame
+
+        Parameters
+        ----------
+        pour_pt : tuple
+          An (x, y) coordinate pair, with the same coordinate system as the grid
+
+        acc_thresh : int (default 1000)
+          The minimum accumulation threshold used during pour point snapping
+
+        Returns
+        -------
+        catch_geom : shapely.Geometry
+          The newly delineated catchment (Multi)Polygon
+        """
+        catch_polys = _get_catchment_polys(
+            pour_pt, self.grid, self.fdir, self._get_acc_mask(acc_thresh)
         )
+        return shapely.union_all(catch_polys)
 
     def delineate_points(
         self, pts: gpd.GeoDataFrame, delineated: set
@@ -149,28 +360,29 @@ class Delineate:
         Returns
         -------
         catchments : gpd.GeoDataFrame
-          The newly delineated catchment for all the provided points, or an empty
-          GeoDataFrame if the provided points have already been delineated
+          The newly delineated catchment for all the provided points, one row per point,
+          or an empty GeoDataFrame if the provided points have already been delineated
 
         delineated : set
           (Same as param delineated, see above)
         """
-        catchments = gpd.GeoDataFrame()
-
-        for pt in pts.itertuples(name="StormPoint"):
-            if pt.Index in delineated:
-                continue
-            else:
-                delineated.add(pt.Index)
-                x = pt.geometry.x
-                y = pt.geometry.y
-                pt_catchment = self.get_catchment((x, y))
-                catchments = gpd.pd.concat(
-                    [catchments, pt_catchment], ignore_index=True
-                )
+        # Skip points that have already been delineated, or that appear more than once
+        pts = pts[~pts.index.isin(delineated) & ~pts.index.duplicated()]
+        delineated.update(pts.index)
 
-        if not catchments.empty:
-            catchments = catchments.set_crs(epsg=self.grid_epsg)
+        coords = list(map(tuple, shapely.get_coordinates(pts.geometry.values).tolist()))
+        if self.n_jobs == 1 or len(coords) < 2:
+            geoms = [self._get_catchment_geom(pt_coords) for pt_coords in coords]
+        elif self._executor is not None:
+            geoms = list(self._executor.map(_get_catchment_worker, coords))
+        else:
+            with self._start_executor() as executor:
+                geoms = list(executor.map(_get_catchment_worker, coords))
+
+        if not geoms:
+            return gpd.GeoDataFrame(), delineated
+
+        catchments = gpd.GeoDataFrame(geometry=geoms, crs=self.crs)
 
         return catchments, delineated
 
@@ -194,42 +406,77 @@ class Delineate:
         catchment: gpd.GeoDataFrame
           A GeoDataFrame containing the newly delineated catchment polygon
         """
-        catchment = self.get_catchment(pour_pt, acc_thresh)
+        catch_geom = self._get_catchment_geom(pour_pt, acc_thresh)
 
         # Keep track of all point indicies which have been delineated
         delineated = set()
 
-        while True:
-            outlet_pts = self.net.get_outlet_points(catchment)
-            if not outlet_pts.empty:
-                outlet_catchments, delineated = self.delineate_points(
-                    outlet_pts, delineated
+        # Start a worker pool, unless a with block has already started one
+        owns_executor = self.n_jobs != 1 and self._executor is None
+        if owns_executor:
+            self._executor = self._start_executor()
+
+        # Between full searches, only the area changed since the last search is searched
+        full_search = True
+        outlet_search_geom = inlet_search_geom = catch_geom
+
+        try:
+            while True:
+                region = None
+                if not full_search:
+                    region = self._to_frame(
+                        shapely.difference(catch_geom, outlet_search_geom)
+                    )
+                outlet_search_geom = catch_geom
+                outlet_pts = self.net.get_outlet_points(
+                    self._to_frame(catch_geom), region=region
                 )
-                if not outlet_catchments.empty:
-                    catchment = gpd.overlay(
-                        catchment, outlet_catchments, how="difference"
-                    ).set_crs(epsg=self.grid_epsg)
-                    catchment = catchment.dissolve()
-                else:
-                    # empty outlet_pts
-                    outlet_pts = gpd.GeoDataFrame()
-
-            inlet_pts = self.net.get_inlet_points(catchment)
-            if not inlet_pts.empty:
-                inlet_catchments, delineated = self.delineate_points(
-                    inlet_pts, delineated
+                if not outlet_pts.empty:
+                    outlet_catchments, delineated = self.delineate_points(
+                        outlet_pts, delineated
+                    )
+                    if not outlet_catchments.empty:
+                        catch_geom = shapely.difference(
+                            catch_geom,
+                            shapely.union_all(outlet_catchments.geometry.values),
+                        )
+                    else:
+                        # empty outlet_pts
+                        outlet_pts = gpd.GeoDataFrame()
+
+                region = None
+                if not full_search:
+                    region = self._to_frame(
+                        shapely.difference(catch_geom, inlet_search_geom)
+                    )
+                inlet_search_geom = catch_geom
+                inlet_pts = self.net.get_inlet_points(
+                    self._to_frame(catch_geom), region=region
                 )
-                if not inlet_catchments.empty:
-                    catchment = gpd.overlay(
-                        catchment, inlet_catchments, how="union", keep_geom_type=False
-                    ).set_crs(epsg=self.grid_epsg)
-                    catchment = catchment.dissolve()
+                if not inlet_pts.empty:
+                    inlet_catchments, delineated = self.delineate_points(
+                        inlet_pts, delineated
+                    )
+                    if not inlet_catchments.empty:
+                        catch_geom = shapely.union(
+                            catch_geom,
+                            shapely.union_all(inlet_catchments.geometry.values),
+                        )
+                    else:
+                        # empty inlet_pts
+                        inlet_pts = gpd.GeoDataFrame()
+
+                if outlet_pts.empty and inlet_pts.empty:
+                    if full_search:
+                        # stormcatchment complete
+                        break
+                    # Removing area can expose new points, so confirm with a full search
+                    full_search = True
                 else:
-                    # empty inlet_pts
-                    inlet_pts = gpd.GeoDataFrame()
-
-            if outlet_pts.empty and inlet_pts.empty:
-                # stormcatchment complete
-                break
+                    full_search = False
+        finally:
+            if owns_executor:
+                self._executor.shutdown()
+                self._executor = None
 
-        return catchment
+        return self._to_frame(catch_geom)
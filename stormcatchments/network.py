@@ -1,11 +1,15 @@
-from collections import namedtuple
+from collections import deque, namedtuple
+from functools import lru_cache
+from itertools import compress
 from typing import Optional
 import warnings
 
 import geopandas as gpd
 import networkx as nx
+import numpy as np
 import pandas as pd
-from shapely.geometry import LineString, MultiPoint, Point
+import shapely
+from shapely.geometry import MultiPoint, Point
 
 
 def get_point_coords(pt_geom, decimals: int = None) -> tuple:
@@ -41,6 +45,25 @@ def get_point_coords(pt_geom, decimals: int = None) -> tuple:
     return x, y
 
 
+@lru_cache(maxsize=None)
+def _storm_point_cls(field_names: tuple) -> type:
+    """
+    Get the StormPoint namedtuple class for a set of point data columns, the class is
+    only created once per unique set of field names
+
+    Parameters
+    ----------
+    field_names : tuple
+        Field names of the namedtuple, the index followed by the point data columns
+
+    Returns
+    -------
+    StormPoint : type
+        namedtuple class with the given field names
+    """
+    return namedtuple("StormPoint", field_names)
+
+
 class Network:
     """
     Parses through stormwater infrastructure point and line data to generate directional
@@ -78,9 +101,11 @@ class Network:
         storm_lines : gpd.GeoDataFrame
             All the stormwater infrastructure line features within the area of interest
         storm_pts : gpd.GeoDataFrame
-            All the stormwater infrastructure points features within the area of interest
-        coord_decimals : int (default 3)
+            All the stormwater infrastructure points features within the area of interest,
+            the Network keeps its own copy with rounded coordinates in self.pts
+        coord_decimals : int | None (default 3)
             Decimal to round line coordinates too, prevents problems with improper snapping
+            (set to None to leave coordinates unrounded)
         type_column : str | None (default None)
             Column in storm_pts GeoDataFrame that represents the type of each point
             (e.g., catchbasins, outfalls, culverts), set to None if IS_SOURCE and
@@ -99,34 +124,31 @@ class Network:
         self.crs = storm_pts.crs
 
         self.lines = storm_lines
-        # Explode all lines into 2-vertex segments while rounding coordinates
         self.G = nx.DiGraph()
         self.directions_resolved = False
-        all_segments = {}
-        for line in storm_lines.itertuples(name="StormLine"):
-            u_coords = line.geometry.coords[:-1]
-            v_coords = line.geometry.coords[1:]
-            # Round all coordinate values
-            u_coords = [
-                tuple([round(x, coord_decimals), round(y, coord_decimals)])
-                for x, y in u_coords
-            ]
-            v_coords = [
-                tuple([round(x, coord_decimals), round(y, coord_decimals)])
-                for x, y in v_coords
-            ]
+        if not (storm_lines.geom_type == "LineString").all():
+            raise ValueError("Line data must only contain LineString geometries")
 
-            segments = list(map(LineString, zip(u_coords, v_coords)))
-            all_segments[line.Index] = segments
+        # Explode all lines into 2-vertex segments while rounding coordinates
+        line_xy, line_ilocs = shapely.get_coordinates(
+            storm_lines.geometry.values, return_index=True
+        )
+        if coord_decimals is not None:
+            # Python's round as points use it, np.round can differ in the last decimal
+            line_xy = np.array(
+                [round(c, coord_decimals) for c in line_xy.ravel().tolist()]
+            ).reshape(-1, 2)
+        # Every vertex starts a segment, except for the last vertex of each line
+        seg_starts = np.flatnonzero(line_ilocs[:-1] == line_ilocs[1:])
+        segments = shapely.linestrings(
+            np.stack([line_xy[seg_starts], line_xy[seg_starts + 1]], axis=1)
+        )
 
         # Retain all segment data with the segment's source index stored in a column
-        self.segments = gpd.GeoDataFrame()
-        for src_index, segments in all_segments.items():
-            segments = gpd.GeoDataFrame(geometry=gpd.GeoSeries(segments), crs=self.crs)
-            segments["src_index"] = src_index
-            self.segments = gpd.pd.concat([self.segments, segments], ignore_index=True)
+        self.segments = gpd.GeoDataFrame(geometry=segments, crs=self.crs)
+        self.segments["src_index"] = storm_lines.index[line_ilocs[seg_starts]]
 
-        self.pts = storm_pts
+        self.pts = storm_pts.copy()
         # Deal with mapping of IS_SOURCE and IS_SINK in point data
         if type_column is None:
             # User supplied SINK and SOURCE data
@@ -161,17 +183,41 @@ class Network:
                     "To map data to IS_SOURCE a source_type argument is required"
                 )
 
-            self.pts["IS_SINK"] = self.pts[type_column].apply(
-                lambda x: True if x in sink_types else False
-            )
-            self.pts["IS_SOURCE"] = self.pts[type_column].apply(
-                lambda x: True if x in source_types else False
-            )
+            self.pts["IS_SINK"] = self.pts[type_column].isin(sink_types)
+            self.pts["IS_SOURCE"] = self.pts[type_column].isin(source_types)
 
         # Round all point coordinate values, also converting any MultiPoints to Points
-        self.pts["geometry"] = self.pts["geometry"].apply(
-            lambda geom: Point([get_point_coords(geom, coord_decimals)])
+        pt_geoms = self.pts.geometry.values
+        is_point = np.isin(
+            shapely.get_type_id(pt_geoms),
+            [shapely.GeometryType.POINT, shapely.GeometryType.MULTIPOINT],
+        )
+        if not (is_point & ~shapely.is_empty(pt_geoms)).all():
+            bad_geom = pt_geoms[~is_point | shapely.is_empty(pt_geoms)][0]
+            raise ValueError(
+                f"Failed to get coords for Point with geometry type: {type(bad_geom)}"
+            )
+        pt_xy, pt_ilocs = shapely.get_coordinates(pt_geoms, return_index=True)
+        # Keep the first coordinate of each geometry, only MultiPoints can have more
+        first = np.unique(pt_ilocs, return_index=True)[1]
+        n_coords = np.diff(np.r_[first, len(pt_ilocs)])
+        for x, y in pt_xy[first[n_coords > 1]].tolist():
+            warnings.warn(
+                f"A point at coordinate ({x}, {y}) has MultiPoint geometry with "
+                "multiple point coordinates, only returning the first"
+            )
+        pt_xy = pt_xy[first]
+        if coord_decimals is not None:
+            pt_xy = np.array(
+                [round(c, coord_decimals) for c in pt_xy.ravel().tolist()]
+            ).reshape(-1, 2)
+        self.pts["geometry"] = gpd.GeoSeries(
+            shapely.points(pt_xy), index=self.pts.index, crs=self.crs
         )
+        # Build the spatial index of the points up front
+        self.pts.sindex
+        self._pt_lookup = None
+        self._pt_lookup_sindex = None
 
     def to_StormPoint(self, pt) -> "StormPoint":
         """
@@ -196,9 +242,8 @@ class Network:
             pt = next(pt_iter)
         elif isinstance(pt, pd.Series):
             # convert to StormPoint namedtuple
-            field_names = self.pts.columns.to_list()
-            field_names.insert(0, "Index")
-            pt = namedtuple("StormPoint", field_names)(pt.name, *pt)
+            field_names = ("Index", *self.pts.columns)
+            pt = _storm_point_cls(field_names)(pt.name, *pt)
         else:
             assert pt.__class__.__name__ == "StormPoint", (
                 f"Expected pt to be a "
@@ -250,9 +295,9 @@ class Network:
 
     def traverse_upstream(self, coords: tuple, visited: set) -> None:
         """
-        Revise direction of edges via recursive depth-first search, starting from an
-        outlet then traverse the graph "upstream". Visits every node that's connected to
-        the initial source node.
+        Revise direction of edges via depth-first search, starting from an outlet then
+        traverse the graph "upstream". Visits every node that's connected to the
+        initial source node.
 
         Parameters
         ----------
@@ -262,15 +307,24 @@ class Network:
         visited : set
             Used to record which coordinates have already been visited in this search
         """
-        v = coords
-        visited.add(v)
-        for u in self.G.predecessors(v):
-            if u not in visited:
-                # Only retain edge from u -> v
-                if self.G.has_edge(v, u):
-                    assert self.G.has_edge(u, v)
-                    self.G.remove_edge(v, u)
-                self.traverse_upstream(u, visited)
+        visited.add(coords)
+        # Reverse edges are removed after the search, which never revisits their nodes
+        reverse_edges = []
+        stack = [(coords, self.G.predecessors(coords))]
+        while stack:
+            v, predecessors = stack[-1]
+            for u in predecessors:
+                if u not in visited:
+                    # Only retain edge from u -> v
+                    if self.G.has_edge(v, u):
+                        reverse_edges.append((v, u))
+                    visited.add(u)
+                    stack.append((u, self.G.predecessors(u)))
+                    break
+            else:
+                stack.pop()
+
+        self.G.remove_edges_from(reverse_edges)
 
     def add_edges(self, direction: str, verbose: bool = False) -> None:
         """
@@ -289,14 +343,23 @@ class Network:
         if verbose:
             print("Adding edges...")
 
+        seg_uv = (
+            shapely.get_coordinates(self.segments.geometry.values)
+            .reshape(-1, 2, 2)
+            .tolist()
+        )
+        # One shared tuple object per node coordinate pair
+        nodes = {node: node for node in self.G}
+        edges = []
+        for u, v in seg_uv:
+            u = tuple(u)
+            v = tuple(v)
+            edges.append((nodes.setdefault(u, u), nodes.setdefault(v, v)))
+
         if direction == "both" or direction == "original":
-            self.segments["geometry"].apply(
-                lambda seg: self.G.add_edge(seg.coords[0], seg.coords[1])
-            )
+            self.G.add_edges_from(edges)
         elif direction == "both" or direction == "reverse":
-            self.segments["geometry"].apply(
-                lambda seg: self.G.add_edge(seg.coords[1], seg.coords[0])
-            )
+            self.G.add_edges_from((v, u) for u, v in edges)
         else:
             raise ValueError(
                 f'direction "{direction}" is invalid, must be "both", "original", or '
@@ -322,11 +385,12 @@ class Network:
         source_pts = self.pts[self.pts["IS_SOURCE"]]
         missing_pts = []
 
-        for pt in source_pts.itertuples(name="StormPoint"):
-            if not self.has_StormPoint(pt):
-                missing_pts.append(pt.Index)
+        source_xy = shapely.get_coordinates(source_pts.geometry.values).tolist()
+        for pt_idx, (x, y) in zip(source_pts.index, source_xy):
+            if (x, y) not in self.G:
+                missing_pts.append(pt_idx)
                 continue
-            self.resolve_upstream(pt)
+            self.traverse_upstream((x, y), set())
 
         if verbose:
             if len(missing_pts) > 0:
@@ -336,13 +400,11 @@ class Network:
                     missing_pts,
                 )
 
-            n_bidirectional = 0
-            n_unidirectional = 0
-            for u, v in self.G.edges():
-                if self.G.has_edge(v, u):
-                    n_bidirectional += 1
-                else:
-                    n_unidirectional += 1
+            succ = self.G.succ
+            n_bidirectional = sum(
+                u in succ[v] for u, nbrs in succ.items() for v in nbrs
+            )
+            n_unidirectional = self.G.number_of_edges() - n_bidirectional
             print(f"Succesfully resolved direction for {n_unidirectional} edges")
             if n_bidirectional > 0:
                 print(f"Failed to resolve direction for {n_bidirectional/2} edges")
@@ -381,7 +443,9 @@ class Network:
 
         self.directions_resolved = True
 
-    def get_outlet(self, pt_idx: int) -> Optional[int]:
+    def get_outlet(
+        self, pt_idx: int, outlet_cache: Optional[dict] = None
+    ) -> Optional[int]:
         """
         Get Index of the outlet for a given storm_pt whose coordinates exist in the
         graph
@@ -390,11 +454,14 @@ class Network:
         ----------
         pt_idx : int
             Index of point, note that OBJECTID is the default index column
+        outlet_cache : dict | None (default None)
+            Outlet coordinates already found for other nodes, to share between
+            repeated calls while self.G is unchanged. Start with an empty dict
         """
         if not self.directions_resolved:
             raise ValueError(f"Cannot get outlet until graph directions are resolved")
 
-        pt_x, pt_y = get_point_coords(self.pts.loc[pt_idx].geometry)
+        pt_x, pt_y = get_point_coords(self.pts.at[pt_idx, "geometry"])
         if (pt_x, pt_y) not in self.G:
             warnings.warn(
                 f"The point with index {pt_idx} does not have its coordinates as a "
@@ -402,8 +469,7 @@ class Network:
             )
             return None
 
-        subG = nx.dfs_tree(self.G, (pt_x, pt_y))
-        outlet_coords = [coords for coords, deg in subG.out_degree() if deg == 0]
+        outlet_coords = self._outlet_coords((pt_x, pt_y), outlet_cache)
         if len(outlet_coords) == 0:
             raise ValueError(f"Subgraph of point with index {pt_idx} has no outlet")
         elif len(outlet_coords) > 1:
@@ -412,8 +478,7 @@ class Network:
                 "only returning the first"
             )
 
-        outlet_x, outlet_y = outlet_coords[0]
-        outlet_pts = self.pts.cx[outlet_x, outlet_y]  # gpd.GeoDataFrame
+        outlet_pts = self._pts_at(outlet_coords[0])
         if len(outlet_pts) == 0:
             return None
         elif len(outlet_pts) > 1:
@@ -422,9 +487,151 @@ class Network:
                 "only returning the first"
             )
 
-        return outlet_pts.iloc[0].name
+        return outlet_pts[0]
+
+    def _outlet_coords(
+        self, coords: tuple, outlet_cache: Optional[dict] = None
+    ) -> list:
+        """
+        Get the coordinates of the outlets downstream of a node, which are the leaves
+        of a depth-first search from that node
+
+        Parameters
+        ----------
+        coords : tuple
+            Tuple of (x, y) float coordinates of a node in self.G
+        outlet_cache : dict | None (default None)
+            Outlet coordinates already found for other nodes, nodes that only have a
+            single chain of edges downstream to their outlet are added to it
+
+        Returns
+        -------
+        outlet_coords : list
+            Coordinates of each outlet, in the order they were found by the search
+        """
+        if outlet_cache is not None:
+            # Follow a single chain of edges downstream, every node along it can only
+            # reach the one outlet at the end of the chain
+            chain = {}
+            node = coords
+            while node not in outlet_cache and node not in chain:
+                chain[node] = None
+                out_degree = self.G.out_degree(node)
+                if out_degree == 0:
+                    outlet_cache.update(dict.fromkeys(chain, node))
+                    return [node]
+                elif out_degree > 1:
+                    break
+                node = next(iter(self.G.successors(node)))
+            else:
+                # Joined a chain that's already been followed, unless it looped back
+                if node in outlet_cache:
+                    outlet_cache.update(dict.fromkeys(chain, outlet_cache[node]))
+                    return [outlet_cache[node]]
+
+        # Leaves of the depth-first search tree, in visit order
+        dfs_edges = list(nx.dfs_edges(self.G, coords))
+        parents = {u for u, _ in dfs_edges}
+        dfs_nodes = [coords] + [v for _, v in dfs_edges]
+        return [node for node in dfs_nodes if node not in parents]
+
+    def _pts_at(self, coords: tuple) -> list:
+        """
+        Get the index of every point located exactly at a coordinate pair
+
+        Parameters
+        ----------
+        coords : tuple
+            Tuple of (x, y) float coordinates, such as the name/index of a node in
+            self.G
+
+        Returns
+        -------
+        pt_indices : list
+            Index of each point at coords, in the order they appear in self.pts
+        """
+        # The coordinate lookup table is rebuilt whenever the spatial index of the
+        # points is, which geopandas resets on any edit to their geometry
+        sindex = self.pts.sindex
+        if self._pt_lookup_sindex is not sindex:
+            pt_xy = shapely.get_coordinates(self.pts.geometry.values).tolist()
+            self._pt_lookup = {}
+            for pt_idx, xy in zip(self.pts.index, pt_xy):
+                self._pt_lookup.setdefault(tuple(xy), []).append(pt_idx)
+            self._pt_lookup_sindex = sindex
+
+        return self._pt_lookup.get(coords, [])
+
+    def _prepared_union(self, polygons: gpd.GeoDataFrame) -> shapely.Geometry:
+        """
+        Union and prepare polygon geometry in the CRS of self.pts
+
+        Parameters
+        ----------
+        polygons : gpd.GeoDataFrame
+            GeoDataFrame containing the polygons, such as a catchment
 
-    def get_outlet_points(self, catchment: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+        Returns
+        -------
+        geom : shapely.Geometry
+            The prepared union of the polygons, in the CRS of self.pts
+        """
+        # Identity check first, skipping the full CRS comparison
+        if polygons.crs is not self.pts.crs and polygons.crs != self.pts.crs:
+            polygons = polygons.to_crs(crs=self.pts.crs)
+
+        geom = shapely.union_all(polygons.geometry.values)
+        shapely.prepare(geom)
+        return geom
+
+    def _points_in_catchment(self, catchment: gpd.GeoDataFrame) -> tuple:
+        """
+        Get all the infrastructure points that intersect the catchment
+
+        Parameters
+        ----------
+        catchment : gpd.GeoDataFrame
+            GeoDataFrame containing the current catchment polygon
+
+        Returns
+        -------
+        catchment_pts : gpd.GeoDataFrame
+            GeoDataFrame containing all the points within the catchment
+        catch_geom : shapely.Geometry
+            The prepared union of the catchment geometry, in the CRS of self.pts
+        """
+        catch_geom = self._prepared_union(catchment)
+
+        # Sorted to retain the original point order
+        pt_ilocs = np.sort(self.pts.sindex.query(catch_geom, predicate="intersects"))
+        return self.pts.iloc[pt_ilocs], catch_geom
+
+    def _in_region(
+        self, pts: gpd.GeoDataFrame, region: Optional[gpd.GeoDataFrame]
+    ) -> gpd.GeoDataFrame:
+        """
+        Filter a subset of self.pts down to those within a region
+
+        Parameters
+        ----------
+        pts : gpd.GeoDataFrame
+            Subset of self.pts to filter
+        region : gpd.GeoDataFrame | None
+            GeoDataFrame containing the region polygon, if None pts are returned as is
+
+        Returns
+        -------
+        region_pts : gpd.GeoDataFrame
+            The points of pts within the region
+        """
+        if region is None:
+            return pts
+        region_geom = self._prepared_union(region)
+        return pts[shapely.intersects(region_geom, pts.geometry.values)]
+
+    def get_outlet_points(
+        self, catchment: gpd.GeoDataFrame, region: Optional[gpd.GeoDataFrame] = None
+    ) -> gpd.GeoDataFrame:
         """
         Get GeoDataFrame of all the infrastructure points within the catchment that
         bring flow out of the current catchment. The catchments for these points will
@@ -434,6 +641,10 @@ class Network:
         ----------
         catchment : gpd.GeoDataFrame
             GeoDataFrame containing the current catchment polygon
+        region : gpd.GeoDataFrame | None (default None)
+            Only consider sinks within this region, such as the area most recently
+            added to the catchment. All sinks within the catchment are considered if
+            None
 
         Returns
         -------
@@ -441,22 +652,33 @@ class Network:
             GeoDataFrame containing all the points that bring flow out of the current
             catchment
         """
-        if catchment.crs != self.pts.crs:
-            catchment = catchment.to_crs(crs=self.pts.crs)
-
-        catchment_pts = gpd.clip(self.pts, catchment)
-        sink_pts = catchment_pts[catchment_pts["IS_SINK"] == True]
+        catchment_pts, _ = self._points_in_catchment(catchment)
+        sink_pts = self._in_region(catchment_pts, region)
+        sink_pts = sink_pts[sink_pts["IS_SINK"] == True]
 
         indicies_to_remove = []
-        sink_pt_inidicies = sink_pts.index.to_list()
+        # Sinks along the same pipe run share their outlet, only search for it once
+        outlet_cache = {}
+        catchment_pt_indicies = set(catchment_pts.index)
+        sink_xy = shapely.get_coordinates(sink_pts.geometry.values).tolist()
+        in_graph = [(x, y) in self.G for x, y in sink_xy]
+        if not all(in_graph):
+            missing = list(compress(sink_pts.index, [not i for i in in_graph]))
+            warnings.warn(
+                f"{len(missing)} sink point(s) do not have their coordinates as a node "
+                f"in the graph, with indices: {missing}"
+            )
+        sink_pt_inidicies = list(compress(sink_pts.index, in_graph))
         for idx in sink_pt_inidicies:
-            outlet_idx = self.get_outlet(idx)
-            if outlet_idx is not None and outlet_idx not in catchment_pts.index:
+            outlet_idx = self.get_outlet(idx, outlet_cache)
+            if outlet_idx is not None and outlet_idx not in catchment_pt_indicies:
                 indicies_to_remove.append(outlet_idx)
 
         return self.pts.loc[indicies_to_remove]
 
-    def get_inlet_points(self, catchment: gpd.GeoDataFrame) -> gpd.GeoDataFrame:
+    def get_inlet_points(
+        self, catchment: gpd.GeoDataFrame, region: Optional[gpd.GeoDataFrame] = None
+    ) -> gpd.GeoDataFrame:
         """
         Get GeoDataFrame of all the infrastructure points outside the catchment that
         bring flow into the catchment.
@@ -465,6 +687,10 @@ class Network:
         ----------
         catchment : gpd.GeoDataFrame
             GeoDataFrame containing the current catchment polygon
+        region : gpd.GeoDataFrame | None (default None)
+            Only consider sources within this region, such as the area most recently
+            added to the catchment. All sources within the catchment are considered if
+            None
 
         Returns
         -------
@@ -477,27 +703,39 @@ class Network:
                 f"Cannot get inlet points until graph directions are resolved"
             )
 
-        if catchment.crs != self.pts.crs:
-            catchment = catchment.to_crs(crs=self.pts.crs)
-
-        catchment_pts = gpd.clip(self.pts, catchment)
-        source_pts = catchment_pts[catchment_pts["IS_SOURCE"] == True]
-        source_pt_geoms = source_pts.geometry.tolist()
-        source_pt_coords = [get_point_coords(geom) for geom in source_pt_geoms]
+        catchment_pts, catch_geom = self._points_in_catchment(catchment)
+        source_pts = self._in_region(catchment_pts, region)
+        source_pts = source_pts[source_pts["IS_SOURCE"] == True]
+        source_pt_coords = list(
+            map(tuple, shapely.get_coordinates(source_pts.geometry.values).tolist())
+        )
 
         contrib_sink_inidices = set()
+        # Shared by all sources, everything upstream of a visited node is searched
+        visited = set()
         for coords in source_pt_coords:
-            tree = nx.bfs_tree(self.G, coords, reverse=True)
-
-            for node in tree.nodes():
-                if catchment.contains(Point(node)).any():
-                    continue
+            if coords in visited:
+                continue
+            visited.add(coords)
+            upstream_nodes = [coords]
+            queue = deque([coords])
+            while queue:
+                for u in self.G.predecessors(queue.popleft()):
+                    if u not in visited:
+                        visited.add(u)
+                        upstream_nodes.append(u)
+                        queue.append(u)
+
+            upstream_xy = np.array(upstream_nodes)
+            outside = ~shapely.contains_xy(
+                catch_geom, upstream_xy[:, 0], upstream_xy[:, 1]
+            )
 
+            for node in compress(upstream_nodes, outside):
                 # Look for StormPoints at these coordinates
-                pt = self.pts.cx[node[0], node[1]]
-                if not pt.empty:
-                    pt = self.to_StormPoint(pt)
-                    contrib_sink_inidices.add(pt.Index)
+                pt_indices = self._pts_at(node)
+                if len(pt_indices) > 0:
+                    contrib_sink_inidices.add(pt_indices[0])
 
         return self.pts.loc[list(contrib_sink_inidices)]
 
@@ -519,8 +757,8 @@ class Network:
             Option to add a contextily basemap to the plot
         """
         import matplotlib.pyplot as plt
-        from matplotlib.collections import LineCollection
-        import numpy as np
+        from matplotlib.collections import LineCollection, PatchCollection
+        from matplotlib.patches import FancyArrow
 
         if add_basemap:
             import contextily as cx
@@ -535,25 +773,26 @@ class Network:
                 extent = extent.to_crs(self.crs)
             envelope = extent["geometry"].envelope.iloc[0]
 
+        edges = list(self.G.edges())
+        if extent is not None and len(edges) > 0:
+            # Exclude edges with no verticies within extent
+            edge_xy = np.array(edges)
+            in_extent = shapely.contains_xy(
+                envelope, edge_xy[:, 0, 0], edge_xy[:, 0, 1]
+            ) | shapely.contains_xy(envelope, edge_xy[:, 1, 0], edge_xy[:, 1, 1])
+            edges = list(compress(edges, in_extent))
+
         bidirectional_edges = []
         directional_edges = []
-        for edge in self.G.edges():
-            if extent is not None:
-                # Exclude edges with no verticies within extent
-                if not envelope.contains(
-                    Point(edge[0][0], edge[0][1])
-                ) and not envelope.contains(Point(edge[1][0], edge[1][1])):
-                    continue
+        for edge in edges:
             if self.G.has_edge(edge[1], edge[0]):
                 bidirectional_edges.append(edge)
             else:
                 directional_edges.append(edge)
 
         # Plot directional edges as arrows
-        for edge in directional_edges:
-            u_x, u_y = edge[0]
-            v_x, v_y = edge[1]
-            ax.arrow(
+        arrows = [
+            FancyArrow(
                 u_x,
                 u_y,
                 v_x - u_x,
@@ -562,17 +801,21 @@ class Network:
                 width=0.1,
                 head_width=2,
                 length_includes_head=True,
-                ec="darkblue",
-                fc="cyan",
-                zorder=1,
             )
+            for (u_x, u_y), (v_x, v_y) in directional_edges
+        ]
+        pc = PatchCollection(arrows, edgecolor="darkblue", facecolor="cyan", zorder=1)
+        ax.add_collection(pc)
 
         # Plot bidirectional edges as segments
-        lc = LineCollection([edge for edge in bidirectional_edges], color="darkblue")
+        lc = LineCollection(bidirectional_edges, color="darkblue")
         ax.add_collection(lc)
 
         if extent is not None:
-            pts = gpd.clip(self.pts, extent["geometry"].envelope)
+            extent_geom = shapely.union_all(extent["geometry"].envelope.values)
+            pts = self.pts.iloc[
+                np.sort(self.pts.sindex.query(extent_geom, predicate="intersects"))
+            ]
         else:
             pts = self.pts
 
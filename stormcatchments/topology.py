@@ -2,7 +2,8 @@ from copy import deepcopy
 
 import geopandas as gpd
 import networkx as nx
-from shapely.geometry import LineString, MultiLineString, Point
+import numpy as np
+import shapely
 
 from stormcatchments.network import Network
 
@@ -24,25 +25,14 @@ def find_floating_points(net: Network) -> gpd.GeoDataFrame:
     floating_pts : gpd.GeoDataFrame
       A GeoDataFrame of any floating points in net.pts
     """
-    floating_pts = []
-    for pt in net.pts.itertuples():
-        # Get all segments that pt touches, could be on a vertex or between verticies
-        touch_segs = net.segments[net.segments.geometry.touches(pt.geometry)]
+    # Encode each (x, y) pair as a complex number so np.isin can compare the pairs
+    seg_xy = shapely.get_coordinates(net.segments.geometry.values)
+    pt_xy = shapely.get_coordinates(net.pts.geometry.values)
+    on_vertex = np.isin(
+        pt_xy[:, 0] + 1j * pt_xy[:, 1], seg_xy[:, 0] + 1j * seg_xy[:, 1]
+    )
 
-        if len(touch_segs) == 0:
-            floating_pts.append(pt)
-            continue
-
-        # Collect segment coordinates as (x, y) tuples
-        seg_coords = set()
-        for l in touch_segs.geometry:
-            for c in l.coords:
-                seg_coords.add(c)
-
-        if (pt.geometry.x, pt.geometry.y) not in seg_coords:
-            floating_pts.append(pt)
-
-    return gpd.GeoDataFrame(floating_pts, crs=net.crs).set_index("Index")
+    return net.pts[~on_vertex].copy()
 
 
 def snap_points(net: Network, tolerance: float) -> Network:
@@ -67,23 +57,32 @@ def snap_points(net: Network, tolerance: float) -> Network:
     floating_pts = find_floating_points(net)
 
     net_snapped = deepcopy(net)
-    for pt in floating_pts.itertuples():
-        nearby = net.segments.cx[
-            pt.geometry.x - tolerance : pt.geometry.x + tolerance,
-            pt.geometry.y - tolerance : pt.geometry.y + tolerance,
-        ]
-
-        closest_xy = None
-        closest_dist = tolerance**2
-        for l in nearby.geometry:
-            for c in l.coords:
-                dist = pt.geometry.distance(Point(c))
-                if dist < closest_dist:
-                    closest_dist = dist
-                    closest_xy = c
-
-        if closest_dist <= tolerance:
-            net_snapped.pts.at[pt.Index, "geometry"] = Point(closest_xy)
+    pt_xy = shapely.get_coordinates(floating_pts.geometry.values)
+    # Pairs of floating point and segment positions, for segments within tolerance
+    pt_pos, seg_pos = net.segments.sindex.query(
+        shapely.box(
+            pt_xy[:, 0] - tolerance,
+            pt_xy[:, 1] - tolerance,
+            pt_xy[:, 0] + tolerance,
+            pt_xy[:, 1] + tolerance,
+        )
+    )
+    if len(pt_pos) == 0:
+        return net_snapped
+
+    # Both vertices of every nearby 2-vertex segment are candidates for its point
+    seg_xy = shapely.get_coordinates(net.segments.geometry.values).reshape(-1, 2, 2)
+    cand_xy = seg_xy[seg_pos].reshape(-1, 2)
+    cand_pt = np.repeat(pt_pos, 2)
+    dist_sq = ((cand_xy - pt_xy[cand_pt]) ** 2).sum(axis=1)
+
+    # Nearest candidate of each point, by sorting on point then squared distance
+    order = np.lexsort((dist_sq, cand_pt))
+    nearest = order[np.r_[True, np.diff(cand_pt[order]) != 0]]
+    nearest = nearest[dist_sq[nearest] <= tolerance**2]
+
+    snap_indices = floating_pts.index[cand_pt[nearest]]
+    net_snapped.pts.loc[snap_indices, "geometry"] = shapely.points(cand_xy[nearest])
 
     return net_snapped
 
@@ -111,20 +110,20 @@ def find_multi_outlet(net: Network) -> gpd.GeoDataFrame:
         )
 
     multi_out_geoms = []
+    is_source = dict(zip(net.pts.index, net.pts["IS_SOURCE"].tolist()))
 
     for c in nx.weakly_connected_components(net.G):
         outlets = set()
         # Count flow sources (outlets) in current weakly connected component
         for n in c:
-            pt = net.pts.cx[n[0] : n[0], n[1] : n[1]]
-            if not pt.empty:
-                pt = pt.iloc[0]
-                if pt.IS_SOURCE:
-                    outlets.add(n)
+            pt_indices = net._pts_at(n)
+            if len(pt_indices) > 0 and is_source[pt_indices[0]]:
+                outlets.add(n)
 
         if len(outlets) > 1:
             subG = nx.subgraph(net.G, c)
-            subG_geom = MultiLineString([LineString(e) for e in subG.edges()])
+            subG_lines = shapely.linestrings(np.array(subG.edges(), dtype=float))
+            subG_geom = shapely.multilinestrings(subG_lines)
             multi_out_geoms.append(subG_geom)
 
     return gpd.GeoDataFrame(geometry=gpd.GeoSeries(multi_out_geoms), crs=net.crs)
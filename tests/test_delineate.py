@@ -1,5 +1,5 @@
 import geopandas as gpd
-from shapely.geometry import Point
+from shapely.geometry import Point, box
 import pytest
 
 from stormcatchments import network, delineate, terrain
@@ -35,6 +35,16 @@ def test_get_catchment(delineate_johnson):
     assert round(catchment.area.values[0]) == 6796
 
 
+def test_get_catchment_restores_grid(delineate_johnson):
+    """Ensure delineation leaves the view of the shared grid unchanged"""
+    delin = delineate_johnson
+    shape = delin.grid.shape
+    affine = delin.grid.affine
+    delin.get_catchment((484636, 237170))
+    assert delin.grid.shape == shape
+    assert delin.grid.affine == affine
+
+
 def test_get_stormcatchment(delineate_johnson):
     delin = delineate_johnson
     pour_pt = (484636, 237170)
@@ -48,3 +58,62 @@ def test_get_stormcatchment(delineate_johnson):
     not_contain_coords = [(484590, 237200), (484750, 237330)]
     for coords in not_contain_coords:
         assert not stormcatchment_geom.contains(Point(coords))
+
+
+def test_delineate_points_skips_delineated(delineate_johnson):
+    """
+    Ensure delineate_points only delineates each point index once, skipping indices
+    that were already delineated or are duplicated within the supplied points
+    """
+    delin = delineate_johnson
+    pts = delin.net.pts.loc[[20845, 21135, 21135, 244244]]
+    delineated = {244244}
+    catchments, delineated = delin.delineate_points(pts, delineated)
+    assert delineated == {20845, 21135, 244244}
+    # One catchment for each of the two newly delineated points
+    assert len(catchments) == 2
+
+    # Every point has now been delineated, so nothing new is returned
+    catchments, delineated = delin.delineate_points(pts, delineated)
+    assert isinstance(catchments, gpd.GeoDataFrame)
+    assert catchments.empty
+    assert delineated == {20845, 21135, 244244}
+
+
+def test_inlet_points_region(delineate_johnson):
+    """Ensure only sources within the region are considered for inlet points"""
+    delin = delineate_johnson
+    catchment = delin.get_catchment((484636, 237170))
+    inlet_pts = delin.net.get_inlet_points(catchment)
+    assert not inlet_pts.empty
+
+    region_pts = delin.net.get_inlet_points(catchment, region=catchment)
+    assert set(region_pts.index) == set(inlet_pts.index)
+
+    far_region = gpd.GeoDataFrame(geometry=[box(0, 0, 1, 1)], crs=catchment.crs)
+    assert delin.net.get_inlet_points(catchment, region=far_region).empty
+
+
+def test_get_stormcatchment_parallel(delineate_johnson):
+    """Ensure delineating points across processes matches serial delineation"""
+    delin = delineate_johnson
+    pour_pt = (484636, 237170)
+    serial = delin.get_stormcatchment(pour_pt)
+    delin.n_jobs = 2
+    parallel = delin.get_stormcatchment(pour_pt)
+    assert serial.iloc[0].geometry.equals(parallel.iloc[0].geometry)
+    assert delin._executor is None
+
+
+def test_get_stormcatchment_context_pool(delineate_johnson):
+    """Ensure a worker pool is kept for all stormcatchments within a with block"""
+    delin = delineate_johnson
+    delin.n_jobs = 2
+    pour_pt = (484636, 237170)
+    with delin:
+        executor = delin._executor
+        first = delin.get_stormcatchment(pour_pt)
+        second = delin.get_stormcatchment(pour_pt)
+        assert delin._executor is executor
+    assert delin._executor is None
+    assert first.iloc[0].geometry.equals(second.iloc[0].geometry)
@@ -1,6 +1,9 @@
+import warnings
+
 import geopandas as gpd
 import networkx as nx
 import pytest
+from shapely.geometry import LineString, Point
 
 from stormcatchments import network
 from stormcatchments.constants import SINK_TYPES_VT, SOURCE_TYPES_VT
@@ -65,6 +68,21 @@ def test_points_in_graph_johnson(net_johnson):
         assert net.G.has_node((x, y))
 
 
+def test_input_pts_unchanged_johnson():
+    """Ensure Network initialization does not modify the supplied point data"""
+    storm_lines = gpd.read_file("tests/test_data/johnson_vt/storm_lines.shp")
+    storm_pts = gpd.read_file("tests/test_data/johnson_vt/storm_pts.shp")
+    original_pts = storm_pts.copy()
+    network.Network(
+        storm_lines,
+        storm_pts,
+        type_column="Type",
+        sink_types=SINK_TYPES_VT,
+        source_types=SOURCE_TYPES_VT,
+    )
+    assert storm_pts.equals(original_pts)
+
+
 def test_resolve_direction_simple_johnson(net_johnson):
     """
     Ensure the direction of a simple 3-node subgraph can be resolved such that the only
@@ -111,6 +129,18 @@ def test_get_outlet_johnson(net_johnson):
     assert net.get_outlet(20847) == 21134
 
 
+def test_get_outlet_cache_johnson(net_johnson):
+    """Ensure outlets found with a shared outlet cache match uncached searches"""
+    net = net_johnson
+    net.resolve_directions()
+    outlet_cache = {}
+    for pt_idx in net.pts[net.pts["IS_SINK"]].index[:100]:
+        with warnings.catch_warnings():
+            warnings.simplefilter("ignore")
+            assert net.get_outlet(pt_idx, outlet_cache) == net.get_outlet(pt_idx)
+    assert len(outlet_cache) > 0
+
+
 def test_resolve_catchment_johnson(net_johnson):
     """
     Test that resolve_catchment_graph removes all bidirectional edges within the
@@ -144,6 +174,57 @@ def test_consec_out_synth(net_synthetic):
     assert len(successors) == 1
 
 
+def test_resolve_direction_long_line():
+    """Resolve a single line with more vertices than the recursion limit"""
+    n_vertices = 5000
+    storm_lines = gpd.GeoDataFrame(
+        geometry=[LineString([(float(i), 0.0) for i in range(n_vertices)])],
+        crs="EPSG:32145",
+    )
+    storm_pts = gpd.GeoDataFrame(
+        {"IS_SINK": [True, False], "IS_SOURCE": [False, True]},
+        geometry=[Point(0.0, 0.0), Point(n_vertices - 1.0, 0.0)],
+        crs="EPSG:32145",
+    )
+    net = network.Network(storm_lines, storm_pts)
+    net.resolve_directions()
+
+    assert net.G.number_of_edges() == n_vertices - 1
+    assert net.get_outlet(0) == 1
+
+
+def test_coord_decimals_none():
+    """Ensure coordinates are left unrounded when coord_decimals is None"""
+    storm_lines = gpd.GeoDataFrame(
+        geometry=[LineString([(0.12345, 0.0), (10.6789, 0.0)])],
+        crs="EPSG:32145",
+    )
+    storm_pts = gpd.GeoDataFrame(
+        {"IS_SINK": [True, False], "IS_SOURCE": [False, True]},
+        geometry=[Point(0.12345, 0.0), Point(10.6789, 0.0)],
+        crs="EPSG:32145",
+    )
+    net = network.Network(storm_lines, storm_pts, coord_decimals=None)
+    net.resolve_directions()
+
+    assert network.get_point_coords(net.pts.loc[0].geometry) == (0.12345, 0.0)
+    assert net.G.has_edge((0.12345, 0.0), (10.6789, 0.0))
+
+
+def test_empty_pts_synth():
+    """Ensure a Network can be built and resolved with an empty point layer"""
+    storm_lines = gpd.read_file("tests/test_data/synthetic/lines.shp")
+    storm_pts = gpd.read_file("tests/test_data/synthetic/pts.shp").iloc[:0]
+    storm_pts["IS_SINK"] = storm_pts["IS_SINK"].astype(bool)
+    storm_pts["IS_SOURCE"] = storm_pts["IS_SOURCE"].astype(bool)
+
+    net = network.Network(storm_lines, storm_pts)
+    net.resolve_directions()
+
+    assert net.pts.empty
+    assert net.G.number_of_edges() > 0
+
+
 # TODO:
 # Add tests for other direction resolution methods
 # Add more tests for the synthetic testing data
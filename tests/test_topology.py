@@ -1,5 +1,5 @@
 import geopandas as gpd
-from shapely.geometry import MultiLineString
+from shapely.geometry import MultiLineString, Point
 import pytest
 
 from stormcatchments import network, topology
@@ -65,3 +65,13 @@ def test_snap_tolerance(net_synth):
 
     assert not net_geom.intersects(pt_18)
     assert net_geom.intersects(pt_21)
+
+
+def test_snap_tolerance_below_one(net_synth):
+    net = net_synth
+    # Float point 21 just off a vertex, closer than a sub-unit tolerance
+    vertex = net.segments.geometry.iloc[0].coords[0]
+    net.pts.at[21, "geometry"] = Point(vertex[0] + 0.3, vertex[1])
+    net_snapped = topology.snap_points(net, 0.5)
+
+    assert net_snapped.pts.loc[21].geometry.equals(Point(vertex))